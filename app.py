@@ -13,6 +13,7 @@ from moviepy.editor import (
 )
 from elevenlabs import VoiceSettings, PronunciationDictionaryVersionLocator
 from elevenlabs.client import ElevenLabs
+from video_packaging import PACKAGING_OPTIONS, PackagingError, write_packaged_video
 
 
 # Local library of reusable base videos / music so users don't have to
@@ -318,6 +319,20 @@ else:
         ),
     )
 
+    # Output MP4 packaging
+    output_packaging = st.radio(
+        "Output Packaging",
+        PACKAGING_OPTIONS,
+        help=(
+            "Fast start reserves space at the front of the file and writes the "
+            "video index there in the same encode, so previews and downloads "
+            "can start playing before the whole file arrives. Fragmented MP4 "
+            "writes a small init segment first, followed by fragments that "
+            "play progressively after it (the fragments need that init "
+            "segment and can't be played on their own)."
+        ),
+    )
+
     # New input fields for text customization
     text_before = st.text_input("Text Before Customization", "Hi")
     variables_input = st.text_area("Variables (one per line)")
@@ -449,15 +464,20 @@ else:
                     final_video = video.set_audio(final_audio)
                     test_output_filename = f"test_{variables[0]}.mp4"
                     test_output_path = os.path.join(output_folder, test_output_filename)
-                    final_video.write_videofile(
-                        test_output_path,
-                        codec="libx264",
-                        audio_codec="aac",
-                        ffmpeg_params=quality_ffmpeg_params(output_quality),
-                    )
-
-                    st.success("Test video generated successfully!")
-                    st.video(test_output_path)
+                    try:
+                        write_packaged_video(
+                            final_video,
+                            test_output_path,
+                            output_packaging,
+                            ffmpeg_params=quality_ffmpeg_params(output_quality),
+                            codec="libx264",
+                            audio_codec="aac",
+                        )
+                    except PackagingError as e:
+                        st.error(str(e))
+                    else:
+                        st.success("Test video generated successfully!")
+                        st.video(test_output_path)
 
     # Move the "Generate Videos" button here
     if st.button("Generate Videos"):
@@ -520,12 +540,20 @@ else:
                                 f"{os.path.splitext(audio_filename)[0]}.mp4"
                             )
                             output_path = os.path.join(output_folder, output_filename)
-                            final_video.write_videofile(
-                                output_path,
-                                codec="libx264",
-                                audio_codec="aac",
-                                ffmpeg_params=quality_ffmpeg_params(output_quality),
-                            )
+                            try:
+                                write_packaged_video(
+                                    final_video,
+                                    output_path,
+                                    output_packaging,
+                                    ffmpeg_params=quality_ffmpeg_params(
+                                        output_quality
+                                    ),
+                                    codec="libx264",
+                                    audio_codec="aac",
+                                )
+                            except PackagingError as e:
+                                st.error(str(e))
+                                continue
                             progress_counter += 1
                             zipf.write(output_path, arcname=output_filename)
 
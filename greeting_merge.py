@@ -6,6 +6,7 @@ from moviepy.editor import (
     CompositeAudioClip,
     VideoFileClip,
 )
+from video_packaging import FAST_START, write_packaged_video
 
 
 # Create a one-second silent audio clip
@@ -60,7 +61,14 @@ for audio_filename in os.listdir(audio_folder):
         output_filename = f"{os.path.splitext(audio_filename)[0]}_Land+Expand.mp4"
         output_path = os.path.join(output_folder, output_filename)
 
-        # Write the final video to a file
-        final_video.write_videofile(output_path, codec="libx264", audio_codec="aac")
+        # Write the final video to a file, reserving room for the moov index
+        # at the front so playback can start before the download finishes
+        write_packaged_video(
+            final_video,
+            output_path,
+            FAST_START,
+            codec="libx264",
+            audio_codec="aac",
+        )
 
 print("Processing complete!")
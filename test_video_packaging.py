@@ -0,0 +1,125 @@
+import struct
+
+import pytest
+
+from video_packaging import (
+    FAST_START,
+    FRAGMENTED,
+    PackagingError,
+    estimate_moov_size,
+    has_reserved_moov_layout,
+    packaging_ffmpeg_params,
+    write_packaged_video,
+)
+
+
+def box(box_type, payload_size=0):
+    return struct.pack(">I4s", 8 + payload_size, box_type) + b"\0" * payload_size
+
+
+def write_mp4(tmp_path, data):
+    path = tmp_path / "out.mp4"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_reserved_moov_layout_accepted(tmp_path):
+    path = write_mp4(
+        tmp_path,
+        box(b"ftyp", 16) + box(b"moov", 100) + box(b"free", 50) + box(b"mdat", 40),
+    )
+    assert has_reserved_moov_layout(path)
+
+
+def test_reserved_moov_layout_with_wide_accepted(tmp_path):
+    path = write_mp4(
+        tmp_path,
+        box(b"ftyp", 16)
+        + box(b"moov", 100)
+        + box(b"free", 50)
+        + box(b"wide")
+        + box(b"mdat", 40),
+    )
+    assert has_reserved_moov_layout(path)
+
+
+def test_moov_overran_reserve_rejected(tmp_path):
+    # Reserve of 64 bytes after ftyp, then wide + mdat. ffmpeg writes a
+    # 100-byte moov at the reserve anyway, clobbering the mdat header and
+    # the start of the media data.
+    reserve = b"\0" * 64
+    media = box(b"wide") + struct.pack(">I4s", 8 + 200, b"mdat") + bytes(
+        range(200)
+    )
+    data = bytearray(box(b"ftyp", 16) + reserve + media)
+    moov = box(b"moov", 92)
+    start = len(box(b"ftyp", 16))
+    data[start : start + len(moov)] = moov
+    path = write_mp4(tmp_path, bytes(data))
+    assert not has_reserved_moov_layout(path)
+
+
+def test_empty_reserve_rejected(tmp_path):
+    path = write_mp4(tmp_path, box(b"ftyp", 16) + b"\0" * 64 + box(b"mdat", 40))
+    assert not has_reserved_moov_layout(path)
+
+
+def test_sizes_must_cover_file_exactly(tmp_path):
+    path = write_mp4(
+        tmp_path,
+        box(b"ftyp", 16)
+        + box(b"moov", 100)
+        + box(b"free", 50)
+        + box(b"mdat", 40)
+        + b"\0\0\0",
+    )
+    assert not has_reserved_moov_layout(path)
+
+
+def test_packaging_params():
+    assert packaging_ffmpeg_params(FRAGMENTED, 60, 30) == [
+        "-movflags",
+        "frag_keyframe+empty_moov+default_base_moof",
+    ]
+    assert packaging_ffmpeg_params(FAST_START, 60, 30) == [
+        "-moov_size",
+        str(estimate_moov_size(60, 30)),
+    ]
+
+
+def test_estimate_grows_with_fps():
+    assert estimate_moov_size(60, 60) > estimate_moov_size(60, 30)
+
+
+class FakeClip:
+    duration = 10
+    fps = 24
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def write_videofile(self, path, **kwargs):
+        self.calls.append(kwargs)
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+
+def test_write_uses_requested_fps(tmp_path):
+    clip = FakeClip(
+        box(b"ftyp", 16) + box(b"moov", 100) + box(b"free", 50) + box(b"mdat", 40)
+    )
+    write_packaged_video(clip, str(tmp_path / "out.mp4"), FAST_START, fps=60)
+    assert clip.calls[0]["ffmpeg_params"] == [
+        "-moov_size",
+        str(estimate_moov_size(10, 60)),
+    ]
+
+
+def test_write_raises_and_removes_corrupt_output(tmp_path):
+    clip = FakeClip(box(b"ftyp", 16) + box(b"moov", 100) + b"\xff" * 30)
+    path = tmp_path / "out.mp4"
+    with pytest.raises(PackagingError):
+        write_packaged_video(clip, str(path), FAST_START)
+    assert not path.exists()
+    assert len(clip.calls) == 1
@@ -0,0 +1,125 @@
+import math
+import os
+import struct
+
+
+# MP4 packaging modes offered for rendered videos.
+FAST_START = "Fast start (index reserved up front)"
+FRAGMENTED = "Fragmented MP4"
+PACKAGING_OPTIONS = [FAST_START, FRAGMENTED]
+
+# AAC frames carry 1024 samples each.
+AAC_FRAME_SAMPLES = 1024
+
+# Upper bound on sample-table bytes per sample, assuming one chunk per
+# sample and one table entry per sample in every run-length table:
+# stts 8 + ctts 8 + stss 4 + stsz 4 + stsc 12 + co64 8 + sdtp 1 + sbgp 8
+# for video, stts 8 + stsz 4 + stsc 12 + co64 8 + sbgp 8 for audio.
+VIDEO_SAMPLE_TABLE_BYTES = 53
+AUDIO_SAMPLE_TABLE_BYTES = 40
+# Everything that doesn't scale with sample count: box headers, codec
+# config, edit lists (incl. AAC priming), metadata.
+MOOV_FIXED_BYTES = 64 * 1024
+
+# Top-level layouts ffmpeg writes with -moov_size once the reserve held.
+RESERVED_MOOV_LAYOUTS = (
+    [b"ftyp", b"moov", b"free", b"mdat"],
+    [b"ftyp", b"moov", b"free", b"wide", b"mdat"],
+)
+
+
+class PackagingError(RuntimeError):
+    """The written MP4 doesn't have the packaging that was asked for."""
+
+
+def estimate_moov_size(duration, fps, audio_fps=44100):
+    """Bytes to reserve at the front of the file for the moov atom.
+
+    An upper bound: every per-sample table is counted at its worst case
+    (see VIDEO_SAMPLE_TABLE_BYTES / AUDIO_SAMPLE_TABLE_BYTES), plus fixed
+    headroom, plus a 50% margin on top.
+    """
+    video_samples = math.ceil(duration * fps) + 1
+    audio_samples = math.ceil(duration * audio_fps / AAC_FRAME_SAMPLES) + 1
+    table_bytes = (
+        video_samples * VIDEO_SAMPLE_TABLE_BYTES
+        + audio_samples * AUDIO_SAMPLE_TABLE_BYTES
+    )
+    return int((table_bytes + MOOV_FIXED_BYTES) * 1.5)
+
+
+def packaging_ffmpeg_params(output_packaging, duration, fps, audio_fps=44100):
+    """ffmpeg muxer params for the chosen MP4 packaging.
+
+    Fast start reserves space for the moov index at the front of the file
+    (-moov_size) so ffmpeg writes it there in the same single mux pass —
+    no +faststart second pass that re-reads and shifts the whole file.
+    Fragmented writes an init segment (empty moov) first and then
+    moof/mdat fragments, so it also needs no index relocation.
+    """
+    if output_packaging == FRAGMENTED:
+        return ["-movflags", "frag_keyframe+empty_moov+default_base_moof"]
+    return ["-moov_size", str(estimate_moov_size(duration, fps, audio_fps))]
+
+
+def top_level_boxes(path):
+    """[(type, size)] for the top-level boxes of an MP4, or None if the
+    chain is broken (bad type, bad size, or sizes not summing to the file
+    size)."""
+    boxes = []
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset < file_size:
+            if offset + 8 > file_size:
+                return None
+            f.seek(offset)
+            size, box_type = struct.unpack(">I4s", f.read(8))
+            if not all(0x20 <= c < 0x7F for c in box_type):
+                return None
+            if size == 1:
+                if offset + 16 > file_size:
+                    return None
+                size = struct.unpack(">Q", f.read(8))[0]
+                if size < 16:
+                    return None
+            elif size < 8:
+                return None
+            boxes.append((box_type, size))
+            offset += size
+    return boxes if offset == file_size else None
+
+
+def has_reserved_moov_layout(path):
+    """True if the MP4 at path is exactly ftyp, moov, free, [wide,] mdat.
+
+    An undersized -moov_size reserve makes ffmpeg write the moov past the
+    reserve and over the start of the media data, which breaks this chain
+    even though the file still starts with ftyp and moov.
+    """
+    boxes = top_level_boxes(path)
+    if boxes is None:
+        return False
+    return [box_type for box_type, _size in boxes] in RESERVED_MOOV_LAYOUTS
+
+
+def write_packaged_video(clip, path, output_packaging, ffmpeg_params=None, **kwargs):
+    """Write clip to path as a single-pass, front-indexed MP4.
+
+    moviepy doesn't surface ffmpeg's exit status, so a fast-start file is
+    checked afterwards and PackagingError is raised (and the corrupt file
+    removed) if the moov didn't fit its reserve.
+    """
+    fps = kwargs.get("fps") or clip.fps
+    audio_fps = kwargs.get("audio_fps", 44100)
+    params = list(ffmpeg_params or []) + packaging_ffmpeg_params(
+        output_packaging, clip.duration, fps, audio_fps
+    )
+    clip.write_videofile(path, ffmpeg_params=params, **kwargs)
+    if output_packaging == FAST_START and not has_reserved_moov_layout(path):
+        os.remove(path)
+        raise PackagingError(
+            f"{os.path.basename(path)}: the video index didn't fit the space "
+            "reserved for it; try Fragmented MP4 packaging."
+        )
+    return path